@@ -6,11 +6,201 @@ workout files that are compatible with Garmin devices and other fitness applicat
 """
 
 import struct
-import datetime
-from typing import List, Dict, Any, BinaryIO
+import time
+from array import array
+from functools import lru_cache
+from itertools import groupby
+from typing import List, Dict, Any, Optional
+
+try:
+    from fastcrc import crc16
+
+    FASTCRC_AVAILABLE = True
+except ImportError:
+    FASTCRC_AVAILABLE = False
 
 from zwo_parser import WorkoutSegment
 
+HEADER_SIZE = 14  # FIT file header size in bytes
+HEADER_STRUCT = struct.Struct("<BBHI4sH")  # FIT file header
+CRC_STRUCT = struct.Struct("<H")  # FIT file CRC trailer
+
+# FIT CRC-16 nibble table, as published in the FIT SDK
+_CRC_NIBBLE_TABLE = (
+    0x0000,
+    0xCC01,
+    0xD801,
+    0x1400,
+    0xF001,
+    0x3C00,
+    0x2800,
+    0xE401,
+    0xA001,
+    0x6C00,
+    0x7800,
+    0xB401,
+    0x5000,
+    0x9C01,
+    0x8801,
+    0x4400,
+)
+
+
+def _calculate_crc_reference(data: bytes, crc: int = 0) -> int:
+    """
+    Calculate the FIT CRC-16 a nibble at a time, as in the FIT SDK.
+
+    This is the reference the table-driven implementations are built from and
+    checked against; it is too slow to use for whole files.
+    """
+    for byte in data:
+        for nibble in (byte & 0xF, (byte >> 4) & 0xF):
+            tmp = _CRC_NIBBLE_TABLE[crc & 0xF]
+            crc = (crc >> 4) & 0x0FFF
+            crc = crc ^ tmp ^ _CRC_NIBBLE_TABLE[nibble]
+    return crc
+
+
+def _build_crc_table():
+    """
+    Expand the FIT CRC nibble table into a 256-entry table indexed by byte.
+
+    Each entry is the CRC of a single byte starting from zero, which lets the
+    CRC loop consume a whole byte per lookup instead of one nibble at a time.
+    """
+    return tuple(_calculate_crc_reference(bytes((byte,))) for byte in range(256))
+
+
+CRC_TABLE = _build_crc_table()
+
+
+# struct format characters for fixed-size FIT field types
+FIELD_FORMATS = {
+    "enum": "B",
+    "uint8": "B",
+    "uint16": "H",
+    "uint32": "I",
+}
+
+
+# (size, base type) of fixed-size FIT field types in definition messages
+FIELD_BASE_TYPES = {
+    "enum": (1, 0),
+    "uint8": (1, 2),
+    "uint16": (2, 132),
+    "uint32": (4, 134),
+}
+STRING_BASE_TYPE = 7
+
+
+@lru_cache(maxsize=128)
+def _get_definition(global_type: int, local_type: int, layout: tuple) -> bytes:
+    """
+    Get the packed definition message for a local message type.
+
+    Definitions only depend on the message shape, so each one is packed once and
+    reused by every write, across writers.
+
+    Args:
+        global_type: FIT global message type number
+        local_type: Local message type assigned to the global type
+        layout: Field numbers and types in definition order (see _get_layout)
+
+    Returns:
+        Bytes of the complete definition message
+
+    Raises:
+        ValueError: If the layout contains an unsupported field type
+    """
+    field_defs = []
+    for field_def_num, field_type in layout:
+        if isinstance(field_type, int):
+            size, base_type = field_type, STRING_BASE_TYPE
+        elif field_type in FIELD_BASE_TYPES:
+            size, base_type = FIELD_BASE_TYPES[field_type]
+        else:
+            raise ValueError(f"Unsupported field type: {field_type}")
+        field_defs.extend((field_def_num, size, base_type))
+
+    return struct.pack(
+        f"<BBBHB{len(field_defs)}B",
+        0x40 | local_type,  # Definition message bit + local type
+        0,  # reserved
+        0,  # architecture (little endian)
+        global_type,  # global message number
+        len(layout),  # number of fields
+        *field_defs,
+    )
+
+
+@lru_cache(maxsize=128)
+def _get_record_struct(layout: tuple) -> struct.Struct:
+    """
+    Get the compiled struct for a data message with the given field layout.
+
+    Records of the same shape (e.g. every WORKOUT_STEP) share one compiled
+    struct.Struct across all writers, so a data message is packed with a
+    single call and its format string is only parsed once.
+
+    Args:
+        layout: Field numbers and types in definition order (see _get_layout)
+
+    Returns:
+        struct.Struct packing the data header byte followed by all field values
+
+    Raises:
+        ValueError: If the layout contains an unsupported field type
+    """
+    fmt = "<B"  # data message header
+    for _, field_type in layout:
+        if isinstance(field_type, int):
+            fmt += f"{field_type}s"
+        elif field_type in FIELD_FORMATS:
+            fmt += FIELD_FORMATS[field_type]
+        else:
+            raise ValueError(f"Unsupported field type: {field_type}")
+    return struct.Struct(fmt)
+
+
+@lru_cache(maxsize=128)
+def _get_run_struct(layout: tuple, count: int) -> struct.Struct:
+    """
+    Get the compiled struct for a run of data messages sharing one layout.
+
+    Args:
+        layout: Data message field layout (see _get_record_struct)
+        count: Number of records in the run
+
+    Returns:
+        struct.Struct packing `count` consecutive data messages
+    """
+    record_format = _get_record_struct(layout).format[1:]  # drop byte order
+    return struct.Struct("<" + record_format * count)
+
+
+def _get_layout(fields: List[tuple]) -> tuple:
+    """
+    Get the layout key of a record.
+
+    The layout is a (field_number, field_type) pair per field, with string
+    fields given as their length in bytes. Records share a definition message
+    only if their layouts are equal, so field numbers must be part of the key.
+    """
+    return tuple(
+        (field_number, len(field_value) if field_type == "string" else field_type)
+        for field_number, field_type, field_value in fields
+    )
+
+
+def _encode_name(name: str) -> bytes:
+    """
+    Encode a name as a 16-byte FIT string field.
+
+    The UTF-8 encoding is truncated to 15 bytes and null padded to exactly 16,
+    so the field always has a null terminator.
+    """
+    return name.encode("utf-8", "replace")[:15].ljust(16, b"\x00")
+
 
 def calculate_ftp_targets(power_low_fraction, ftp, power_high_fraction=None):
     """
@@ -63,6 +253,50 @@ def calculate_ftp_targets(power_low_fraction, ftp, power_high_fraction=None):
     return target_low, target_high
 
 
+def calculate_ftp_targets_bulk(power_low_fractions, ftp, power_high_fractions=None):
+    """
+    Calculate target_low and target_high values for many workout steps at once.
+
+    Applies calculate_ftp_targets to each pair of fractions. Workouts have tens
+    of steps, too few for array arithmetic to pay for importing NumPy.
+
+    Args:
+        power_low_fractions: Sequence of power fractions of FTP (one per step)
+        ftp: Functional Threshold Power in watts (required)
+        power_high_fractions: Optional sequence of high power fractions for ranges
+
+    Returns:
+        tuple: (targets_low, targets_high) - lists of integer values for FIT file
+    """
+    if power_high_fractions is None:
+        power_high_fractions = power_low_fractions
+
+    targets_low = []
+    targets_high = []
+    for low, high in zip(power_low_fractions, power_high_fractions):
+        target_low, target_high = calculate_ftp_targets(low, ftp, high)
+        targets_low.append(target_low)
+        targets_high.append(target_high)
+
+    return targets_low, targets_high
+
+
+# Intensity and step name template for each workout segment type. Templates are
+# formatted with the step's low/high power in percent of FTP and its 1-based number.
+SEGMENT_STEPS = {
+    "warmup": (2, "Warmup {low:.0f}-{high:.0f}%"),  # warmup
+    "cooldown": (3, "Cooldown {low:.0f}-{high:.0f}%"),  # cooldown
+    "steady": (0, "Steady {low:.0f}%"),  # active
+    "interval_work": (0, "Work {low:.0f}%"),  # active
+    "interval_rest": (1, "Rest {low:.0f}%"),  # rest
+}
+DEFAULT_SEGMENT_STEP = (0, "Step {number}")  # generic step name
+
+# Segment types in SEGMENT_STEPS that ramp from power_start to power_end; the
+# others hold a single power
+RAMP_TYPES = frozenset(("warmup", "cooldown"))
+
+
 class FITFileWriter:
     """
     A writer for FIT workout files.
@@ -73,22 +307,30 @@ class FITFileWriter:
 
     def __init__(self):
         """Initialize the FIT file writer."""
-        self.data_records = []
+        # Messages are stored as parallel arrays (structure of arrays)
+        self._global_types = array("H")
+        self._fields = []
         self.local_message_types = {}
         self.next_local_type = 0
 
-    def add_file_id_message(self):
+    def add_file_id_message(self, now: Optional[int] = None):
         """
         Add file ID message to identify this as a workout file.
 
         This message must be the first message in any FIT file and identifies
         the file type, manufacturer, and creation time.
+
+        Args:
+            now: Creation time as a Unix timestamp (default: current time)
         """
+        if now is None:
+            now = int(time.time())
+
         fields = [
             (0, "enum", 4),  # type = workout (4)
             (1, "uint16", 1),  # manufacturer = Development (1)
             (2, "uint16", 1),  # product = 1
-            (3, "uint32", int(datetime.datetime.now().timestamp())),  # time_created
+            (3, "uint32", now),  # time_created
         ]
         self._add_message(0, fields)  # FILE_ID global message type
 
@@ -100,9 +342,7 @@ class FITFileWriter:
             name: Workout name (will be truncated to 15 characters)
             num_steps: Number of workout steps that will follow
         """
-        name_bytes = name.encode("utf-8")[:15]  # Limit to 15 chars
-        # Pad with nulls to make it exactly 16 bytes
-        name_bytes = name_bytes + b"\x00" * (16 - len(name_bytes))
+        name_bytes = _encode_name(name)
 
         fields = [
             (4, "string", name_bytes),  # wkt_name
@@ -133,8 +373,7 @@ class FITFileWriter:
             target_high: Upper bound of target power range (in device-specific units)
             intensity: Intensity level (0=active, 1=rest, 2=warmup, 3=cooldown)
         """
-        name_bytes = step_name.encode("utf-8")[:15]
-        name_bytes = name_bytes + b"\x00" * (16 - len(name_bytes))
+        name_bytes = _encode_name(step_name)
 
         fields = [
             (254, "uint16", step_index),  # message_index
@@ -158,7 +397,26 @@ class FITFileWriter:
             global_msg_type: FIT global message type number
             fields: List of (field_number, field_type, field_value) tuples
         """
-        self.data_records.append({"global_type": global_msg_type, "fields": fields})
+        # Assign local message type on first use of the global type
+        if global_msg_type not in self.local_message_types:
+            self.local_message_types[global_msg_type] = self.next_local_type
+            self.next_local_type += 1
+
+        self._global_types.append(global_msg_type)
+        self._fields.append(fields)
+
+    @property
+    def data_records(self) -> List[Dict[str, Any]]:
+        """
+        Messages added so far, as a list of {"global_type", "fields"} records.
+
+        The list is built on demand from the internal parallel arrays; modifying
+        it does not change the messages that will be written.
+        """
+        return [
+            {"global_type": global_type, "fields": fields}
+            for global_type, fields in zip(self._global_types, self._fields)
+        ]
 
     def write_fit_file(self, output_path: str) -> int:
         """
@@ -174,172 +432,147 @@ class FITFileWriter:
             IOError: If file cannot be written
             ValueError: If no messages have been added
         """
-        if not self.data_records:
+        if not self._fields:
             raise ValueError("No messages to write. Add at least a file ID message.")
 
         try:
-            # Step 1: Write header and data without CRC
-            with open(output_path, "wb") as f:
-                # Write header placeholder
-                header_size = 14
-                f.write(b"\x00" * header_size)  # Placeholder header
-
-                data_start_pos = f.tell()
-
-                # Write all messages (definition + data)
-                for record in self.data_records:
-                    self._write_message_pair(f, record)
-
-                data_end_pos = f.tell()
-                data_size = data_end_pos - data_start_pos
+            # Step 1: Serialize header placeholder and all messages into one
+            # output buffer, one run of same-shaped records at a time
+            buf = bytearray(HEADER_SIZE)
+            defined_layouts = {}  # local type -> layout of its last definition
+            runs = groupby(
+                zip(self._global_types, self._fields),
+                key=lambda record: (record[0], _get_layout(record[1])),
+            )
+            for (global_type, layout), run in runs:
+                self._write_message_run(
+                    buf,
+                    global_type,
+                    layout,
+                    [fields for _, fields in run],
+                    defined_layouts,
+                )
 
-                # Write real header
-                f.seek(0)
-                self._write_header(f, data_size)
+            # Step 2: Fill in the real header now that the data size is known
+            self._write_header(buf, len(buf) - HEADER_SIZE)
 
-            # Step 2: Calculate CRC over the entire file (header + data)
-            with open(output_path, "rb") as f:
-                file_data = f.read()  # Read header + data (no CRC yet)
-                crc = self._calculate_crc(file_data)
+            # Step 3: Calculate CRC over header + data and append it
+            crc = self._calculate_crc(memoryview(buf))
+            buf += CRC_STRUCT.pack(crc)
 
-            # Step 3: Append CRC to file
-            with open(output_path, "ab") as f:
-                f.write(struct.pack("<H", crc))
+            # Step 4: Write the whole file with a single call; the buffered
+            # writer retries short writes until every byte is written
+            with open(output_path, "wb") as f:
+                f.write(buf)
 
             return crc
 
         except Exception as e:
             raise IOError(f"Error writing FIT file: {e}")
 
-    def _write_header(self, f: BinaryIO, data_size: int):
+    def _write_header(self, buf: bytearray, data_size: int):
         """
-        Write FIT file header.
+        Write FIT file header into the start of the output buffer.
 
         Args:
-            f: File object to write to
+            buf: Output buffer with HEADER_SIZE bytes reserved at the start
             data_size: Size of data section in bytes
         """
-        header = bytearray(14)
-        header[0] = 14  # header_size
-        header[1] = 32  # protocol_version (2.0)
-        header[2:4] = struct.pack("<H", 2105)  # profile_version
-        header[4:8] = struct.pack("<I", data_size)  # data_size
-        header[8:12] = b".FIT"  # data_type
+        HEADER_STRUCT.pack_into(
+            buf,
+            0,
+            HEADER_SIZE,  # header_size
+            32,  # protocol_version (2.0)
+            2105,  # profile_version
+            data_size,  # data_size
+            b".FIT",  # data_type
+            0,  # header CRC (filled in below)
+        )
+
+        # Header CRC covers the 12 header bytes before it
+        header_crc = self._calculate_crc(buf[: HEADER_SIZE - 2])
+        CRC_STRUCT.pack_into(buf, HEADER_SIZE - 2, header_crc)
+
+    def _write_message_run(
+        self,
+        buf: bytearray,
+        global_type: int,
+        layout: tuple,
+        records: List[List[tuple]],
+        defined_layouts: Dict[int, tuple],
+    ):
+        """
+        Write a run of consecutive records sharing the same global type and layout.
+
+        A definition message is only written when the local message type has not
+        been defined yet in this file, or was last defined with a different
+        layout, i.e. different field numbers or field types. The data messages of
+        the whole run are then packed with a single struct call.
+
+        Args:
+            buf: Output buffer to append to
+            global_type: FIT global message type number shared by the run
+            layout: Field layout shared by the run (see _get_layout)
+            records: Field lists of the records, all with the same layout
+            defined_layouts: Layout of the current definition of each local
+                message type written so far; updated in place
+        """
+        local_type = self.local_message_types[global_type]
 
-        # Header CRC (optional, set to 0)
-        header[12:14] = struct.pack("<H", 0)
+        if defined_layouts.get(local_type) != layout:
+            self._write_definition(buf, global_type, local_type, layout)
+            defined_layouts[local_type] = layout
 
-        f.write(header)
+        run_struct = _get_run_struct(layout, len(records))
+        values = []
+        append, extend = values.append, values.extend  # bound once for the loop
+        for record_fields in records:
+            append(local_type)
+            extend([field[2] for field in record_fields])
+        buf.extend(run_struct.pack(*values))
 
-    def _write_message_pair(self, f: BinaryIO, record: Dict[str, Any]):
+    def _write_definition(
+        self, buf: bytearray, global_type: int, local_type: int, layout: tuple
+    ):
         """
-        Write definition message followed by data message.
+        Write a definition message describing the layout of a data message.
 
         Args:
-            f: File object to write to
-            record: Message record containing global_type and fields
+            buf: Output buffer to append to
+            global_type: FIT global message type number
+            local_type: Local message type assigned to the global type
+            layout: Field layout of the data messages (see _get_layout)
         """
-        global_type = record["global_type"]
-        fields = record["fields"]
-
-        # Assign local message type
-        if global_type not in self.local_message_types:
-            self.local_message_types[global_type] = self.next_local_type
-            self.next_local_type += 1
+        buf.extend(_get_definition(global_type, local_type, layout))
 
-        local_type = self.local_message_types[global_type]
-
-        # Write definition message
-        def_header = 0x40 | local_type  # Definition message bit + local type
-        f.write(struct.pack("B", def_header))
-        f.write(struct.pack("B", 0))  # reserved
-        f.write(struct.pack("B", 0))  # architecture (little endian)
-        f.write(struct.pack("<H", global_type))  # global message number
-        f.write(struct.pack("B", len(fields)))  # number of fields
-
-        # Write field definitions
-        for field_def_num, field_type, field_value in fields:
-            f.write(struct.pack("B", field_def_num))  # field definition number
-
-            if field_type == "string":
-                f.write(struct.pack("B", len(field_value)))  # size
-                f.write(struct.pack("B", 7))  # base type (string)
-            elif field_type == "enum":
-                f.write(struct.pack("B", 1))  # size
-                f.write(struct.pack("B", 0))  # base type (enum)
-            elif field_type == "uint8":
-                f.write(struct.pack("B", 1))  # size
-                f.write(struct.pack("B", 2))  # base type (uint8)
-            elif field_type == "uint16":
-                f.write(struct.pack("B", 2))  # size
-                f.write(struct.pack("B", 132))  # base type (uint16)
-            elif field_type == "uint32":
-                f.write(struct.pack("B", 4))  # size
-                f.write(struct.pack("B", 134))  # base type (uint32)
-            else:
-                raise ValueError(f"Unsupported field type: {field_type}")
-
-        # Write data message
-        data_header = local_type  # Data message (no definition bit)
-        f.write(struct.pack("B", data_header))
-
-        # Write field data in the same order as definition
-        for field_def_num, field_type, field_value in fields:
-            if field_type == "string":
-                f.write(field_value)
-            elif field_type in ["enum", "uint8"]:
-                f.write(struct.pack("B", field_value))
-            elif field_type == "uint16":
-                f.write(struct.pack("<H", field_value))
-            elif field_type == "uint32":
-                f.write(struct.pack("<I", field_value))
-
-    def _calculate_crc(self, data: bytes) -> int:
+    def _calculate_crc(self, data: bytes, crc: int = 0) -> int:
         """
         Calculate CRC-16 for FIT files using the correct FIT CRC algorithm.
 
+        The FIT CRC is CRC-16/ARC (reflected polynomial 0xA001), which no stdlib
+        function implements (binascii.crc_hqx uses CRC-CCITT). It is computed
+        natively by fastcrc when installed, and in pure Python otherwise.
+
         Args:
             data: Bytes to calculate CRC for
+            crc: Running CRC to continue from (default: 0 for a new calculation)
 
         Returns:
             16-bit CRC value
         """
-        crc_table = [
-            0x0000,
-            0xCC01,
-            0xD801,
-            0x1400,
-            0xF001,
-            0x3C00,
-            0x2800,
-            0xE401,
-            0xA001,
-            0x6C00,
-            0x7800,
-            0xB401,
-            0x5000,
-            0x9C01,
-            0x8801,
-            0x4400,
-        ]
+        if FASTCRC_AVAILABLE:
+            return crc16.arc(data, crc)
 
-        crc = 0
+        crc_table = CRC_TABLE
         for byte in data:
-            # Process lower nibble
-            tmp = crc_table[crc & 0xF]
-            crc = (crc >> 4) & 0x0FFF
-            crc = crc ^ tmp ^ crc_table[byte & 0xF]
-
-            # Process upper nibble
-            tmp = crc_table[crc & 0xF]
-            crc = (crc >> 4) & 0x0FFF
-            crc = crc ^ tmp ^ crc_table[(byte >> 4) & 0xF]
+            crc = (crc >> 8) ^ crc_table[(crc ^ byte) & 0xFF]
 
         return crc & 0xFFFF
 
     def clear(self):
         """Clear all messages and reset the writer state."""
-        self.data_records.clear()
+        del self._global_types[:]
+        self._fields.clear()
         self.local_message_types.clear()
         self.next_local_type = 0
 
@@ -369,7 +602,25 @@ class FITFileWriter:
         if not segments:
             raise ValueError("No segments provided. Cannot create empty workout.")
 
-        # Use the calculate_ftp_targets function from this module
+        # Collect power fractions so targets for the whole workout are calculated
+        # in one call
+        low_fractions = []
+        high_fractions = []
+        for segment in segments:
+            if segment.type in RAMP_TYPES:
+                low_fractions.append(segment.power_start)
+                high_fractions.append(segment.power_end)
+            elif segment.type in SEGMENT_STEPS:
+                low_fractions.append(segment.power)
+                high_fractions.append(segment.power)
+            else:
+                # Default case - use 50% FTP
+                low_fractions.append(0.5)
+                high_fractions.append(0.5)
+
+        targets_low, targets_high = calculate_ftp_targets_bulk(
+            low_fractions, ftp=ftp, power_high_fractions=high_fractions
+        )
 
         # Clear any existing data
         self.clear()
@@ -386,46 +637,13 @@ class FITFileWriter:
             duration_type = 0
             duration_value = segment.duration * 1000  # Convert to milliseconds
 
-            # Determine target power and intensity using reverse-engineered formula
-            if segment.type == "warmup":
-                # For warmup, use power range with correct FIT encoding
-                target_low, target_high = calculate_ftp_targets(
-                    segment.power_start, ftp=ftp, power_high_fraction=segment.power_end
-                )
-                intensity = 2  # warmup
-                step_name = f"Warmup {segment.power_start * 100:.0f}-{segment.power_end * 100:.0f}%"
-
-            elif segment.type == "cooldown":
-                # For cooldown, use power range with correct FIT encoding
-                target_low, target_high = calculate_ftp_targets(
-                    segment.power_start, ftp=ftp, power_high_fraction=segment.power_end
-                )
-                intensity = 3  # cooldown
-                step_name = f"Cooldown {segment.power_start * 100:.0f}-{segment.power_end * 100:.0f}%"
-
-            elif segment.type == "steady":
-                # For steady state, use single power value with correct FIT encoding
-                target_low, target_high = calculate_ftp_targets(segment.power, ftp=ftp)
-                intensity = 0  # active
-                step_name = f"Steady {segment.power * 100:.0f}%"
-
-            elif segment.type == "interval_work":
-                # For work intervals, use single power value with correct FIT encoding
-                target_low, target_high = calculate_ftp_targets(segment.power, ftp=ftp)
-                intensity = 0  # active
-                step_name = f"Work {segment.power * 100:.0f}%"
-
-            elif segment.type == "interval_rest":
-                # For rest intervals, use single power value with correct FIT encoding
-                target_low, target_high = calculate_ftp_targets(segment.power, ftp=ftp)
-                intensity = 1  # rest
-                step_name = f"Rest {segment.power * 100:.0f}%"
-
-            else:
-                # Default case - use 50% FTP with correct FIT encoding
-                target_low, target_high = calculate_ftp_targets(0.5, ftp=ftp)
-                intensity = 0
-                step_name = f"Step {i + 1}"
+            # Determine intensity and step name
+            intensity, name_format = SEGMENT_STEPS.get(
+                segment.type, DEFAULT_SEGMENT_STEP
+            )
+            step_name = name_format.format(
+                low=low_fractions[i] * 100, high=high_fractions[i] * 100, number=i + 1
+            )
 
             # Add the workout step
             self.add_workout_step(
@@ -433,8 +651,8 @@ class FITFileWriter:
                 step_name=step_name,
                 duration_type=duration_type,
                 duration_value=duration_value,
-                target_low=target_low,
-                target_high=target_high,
+                target_low=targets_low[i],
+                target_high=targets_high[i],
                 intensity=intensity,
             )
 
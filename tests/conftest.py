@@ -10,3 +10,19 @@ from pathlib import Path
 def test_files_dir():
     """Get the path to test files directory"""
     return Path(__file__).parent
+
+
+@pytest.fixture(scope="session")
+def large_intervals_zwo(tmp_path_factory):
+    """Get the path to a ZWO file with a single IntervalsT block of 100 repeats"""
+    zwo_path = tmp_path_factory.mktemp("perf") / "large_intervals.zwo"
+    zwo_path.write_text(
+        '<?xml version="1.0"?>'
+        "<workout_file>"
+        "<name>Large Interval Test</name>"
+        "<workout>"
+        '<IntervalsT Repeat="100" OnDuration="10" OffDuration="5" OnPower="1.0" OffPower="0.5"/>'
+        "</workout>"
+        "</workout_file>"
+    )
+    return zwo_path
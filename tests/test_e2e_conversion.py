@@ -8,11 +8,19 @@ workflow from parsing ZWO files to writing valid FIT files.
 import pytest
 import struct
 import os
+import shutil
 from pathlib import Path
 
 from zwo_parser import parse_zwo_to_workout
 from fit_writer import FITFileWriter
-from zwift2fit import convert_zwo_to_fit, create_fit_file
+import zwift2fit
+from zwift2fit import convert_zwo_to_fit, batch_convert_zwo_to_fit, create_fit_file
+
+
+@pytest.fixture(scope="module")
+def project_zwo_files():
+    """ZWO files in the project root, scanned once per module"""
+    return sorted(Path(__file__).parent.parent.glob("*.zwo"))
 
 
 class TestEndToEndConversion:
@@ -164,6 +172,17 @@ class TestEndToEndConversion:
         actual_size = fit_path.stat().st_size
         assert actual_size == expected_size
 
+    def test_fit_file_passes_sdk_integrity_check(self, tmp_path):
+        """Test that the Garmin FIT SDK accepts the header and file CRCs"""
+        garmin_fit_sdk = pytest.importorskip("garmin_fit_sdk")
+
+        zwo_path = Path(__file__).parent / "test_intervals.zwo"
+        fit_path = tmp_path / "integrity.fit"
+        assert convert_zwo_to_fit(str(zwo_path), str(fit_path), ftp=250) is True
+
+        stream = garmin_fit_sdk.Stream.from_file(str(fit_path))
+        assert garmin_fit_sdk.Decoder(stream).check_integrity()
+
     def test_different_ftp_values(self, tmp_path):
         """Test conversion with different FTP values produces different results"""
         # Use existing test_minimal.zwo fixture
@@ -217,6 +236,79 @@ class TestEndToEndConversion:
         workout = parse_zwo_to_workout(str(zwo_path))
         assert "测试 Тест Épreuve" in workout.name
 
+    def test_default_fit_path_replaces_only_suffix(self, tmp_path):
+        """Test that the default FIT path only changes the file extension"""
+        zwo_dir = tmp_path / "workouts.zwo"
+        zwo_dir.mkdir()
+        zwo_path = zwo_dir / "basic.zwo"
+        shutil.copy(Path(__file__).parent / "test_basic.zwo", zwo_path)
+
+        assert convert_zwo_to_fit(str(zwo_path), ftp=250) is True
+        assert (zwo_dir / "basic.fit").exists()
+
+    @pytest.mark.parametrize("parallel", [False, True])
+    def test_batch_conversion(self, tmp_path, capsys, monkeypatch, parallel):
+        """Test converting a directory of ZWO files into another directory"""
+        # Force the process pool on or off regardless of the batch size
+        monkeypatch.setattr(
+            zwift2fit, "PARALLEL_BATCH_MIN_FILES", 0 if parallel else 100
+        )
+        test_dir = Path(__file__).parent
+        input_dir = tmp_path / "zwo"
+        output_dir = tmp_path / "fit"
+        input_dir.mkdir()
+        for fixture_name in ["test_basic.zwo", "test_intervals.zwo", "test_empty.zwo"]:
+            shutil.copy(test_dir / fixture_name, input_dir)
+
+        batch_convert_zwo_to_fit(str(input_dir), str(output_dir), ftp=250)
+
+        # The empty workout has no segments and is reported as a failure
+        assert "Successfully converted 2/3 files" in capsys.readouterr().out
+        assert (output_dir / "test_basic.fit").exists()
+        assert (output_dir / "test_intervals.fit").exists()
+        assert not (output_dir / "test_empty.fit").exists()
+
+    def test_batch_conversion_skip_unchanged(self, tmp_path, capfd):
+        """Test that batch conversion can skip files whose FIT output is current"""
+        # capfd, since per-file messages may come from worker processes
+        test_dir = Path(__file__).parent
+        input_dir = tmp_path / "zwo"
+        input_dir.mkdir()
+        shutil.copy(test_dir / "test_basic.zwo", input_dir)
+        shutil.copy(test_dir / "test_minimal.zwo", input_dir)
+
+        batch_convert_zwo_to_fit(str(input_dir), ftp=250)
+        capfd.readouterr()
+
+        # Make the basic workout newer than its FIT file
+        zwo_path = input_dir / "test_basic.zwo"
+        fit_stat = (input_dir / "test_basic.fit").stat()
+        os.utime(zwo_path, ns=(fit_stat.st_atime_ns, fit_stat.st_mtime_ns + 10**9))
+
+        batch_convert_zwo_to_fit(str(input_dir), ftp=250, skip_unchanged=True)
+
+        output = capfd.readouterr().out
+        assert "Converted: " + str(zwo_path) in output
+        assert "Up to date: " + str(input_dir / "test_minimal.fit") in output
+        assert "Successfully converted 2/2 files" in output
+
+    def test_skip_unchanged_single_file(self, tmp_path, capsys):
+        """Test that an up-to-date FIT file is not converted again"""
+        zwo_path = Path(__file__).parent / "test_basic.zwo"
+        fit_path = tmp_path / "basic.fit"
+
+        assert convert_zwo_to_fit(str(zwo_path), str(fit_path), ftp=250) is True
+        mtime_ns = fit_path.stat().st_mtime_ns
+        capsys.readouterr()
+
+        result = convert_zwo_to_fit(
+            str(zwo_path), str(fit_path), ftp=250, skip_unchanged=True
+        )
+
+        assert result is True
+        assert "Up to date: " + str(fit_path) in capsys.readouterr().out
+        assert fit_path.stat().st_mtime_ns == mtime_ns
+
 
 class TestErrorHandling:
     """Test error handling in end-to-end conversion"""
@@ -368,6 +460,23 @@ class TestIntegrationWithRealFiles:
         assert len(workout.segments) > 0
         assert workout.name == "1 Max Oclock"
 
+    def test_existing_zwo_files_if_present(self, project_zwo_files, tmp_path):
+        """Test conversion of every ZWO file found in the project root"""
+        if not project_zwo_files:
+            pytest.skip("No .zwo files in project root")
+
+        for zwo_path in project_zwo_files:
+            fit_path = tmp_path / zwo_path.with_suffix(".fit").name
+
+            if not parse_zwo_to_workout(str(zwo_path)).segments:
+                continue
+
+            assert convert_zwo_to_fit(str(zwo_path), str(fit_path), ftp=280) is True
+
+            with open(fit_path, "rb") as f:
+                header = f.read(14)
+                assert header[8:12] == b".FIT"
+
 
 if __name__ == "__main__":
     pytest.main([__file__])
@@ -8,8 +8,15 @@ including testing of message creation, file structure, and edge cases.
 import pytest
 import struct
 
+import fit_writer
+
 # Add parent directory to path to import the module
-from fit_writer import FITFileWriter, calculate_ftp_targets
+from fit_writer import (
+    FITFileWriter,
+    _calculate_crc_reference,
+    calculate_ftp_targets,
+    calculate_ftp_targets_bulk,
+)
 
 
 class TestFITFileWriter:
@@ -61,6 +68,14 @@ class TestMessageCreation:
         assert isinstance(fields[3][2], int)
         assert fields[3][2] > 1000000000  # Reasonable timestamp
 
+    def test_add_file_id_message_fixed_time(self):
+        """Test file ID message with an explicit creation time"""
+        writer = FITFileWriter()
+        writer.add_file_id_message(now=1700000000)
+
+        fields = writer.data_records[0]["fields"]
+        assert fields[3] == (3, "uint32", 1700000000)
+
     def test_add_workout_message(self):
         """Test adding workout message"""
         writer = FITFileWriter()
@@ -201,6 +216,18 @@ class TestFileWriting:
             file_crc = struct.unpack("<H", crc_bytes)[0]
             assert file_crc == crc
 
+    def test_write_header_crc(self, tmp_path):
+        """Test that the header CRC covers the first 12 header bytes"""
+        writer = FITFileWriter()
+        writer.add_file_id_message()
+
+        temp_path = tmp_path / "header_crc.fit"
+        writer.write_fit_file(str(temp_path))
+
+        header = temp_path.read_bytes()[:14]
+        header_crc = struct.unpack("<H", header[12:14])[0]
+        assert header_crc == _calculate_crc_reference(header[:12])
+
     def test_write_complete_workout_file(self, tmp_path):
         """Test writing complete workout file with multiple messages"""
         writer = FITFileWriter()
@@ -235,6 +262,19 @@ class TestFileWriting:
             writer.write_fit_file(invalid_path)
 
 
+@pytest.fixture(params=["fastcrc", "python"])
+def crc_backend(request, monkeypatch):
+    """Run a test once per CRC backend, skipping backends that aren't installed"""
+    backend = request.param
+    if backend == "fastcrc" and not fit_writer.FASTCRC_AVAILABLE:
+        pytest.skip("fastcrc is not installed")
+
+    if backend == "python":
+        monkeypatch.setattr(fit_writer, "FASTCRC_AVAILABLE", False)
+    return backend
+
+
+@pytest.mark.usefixtures("crc_backend")
 class TestCRCCalculation:
     """Test CRC calculation functionality"""
 
@@ -258,6 +298,11 @@ class TestCRCCalculation:
         assert 0 <= crc2 <= 0xFFFF
         assert crc1 != crc2  # Different input should give different CRC
 
+    def test_crc_check_value(self):
+        """Test the standard CRC-16/ARC check value used by the FIT CRC"""
+        writer = FITFileWriter()
+        assert writer._calculate_crc(b"123456789") == 0xBB3D
+
     def test_crc_consistency(self):
         """Test that CRC calculation is consistent"""
         writer = FITFileWriter()
@@ -275,12 +320,38 @@ class TestCRCCalculation:
         crc2 = writer._calculate_crc(b"test data 2")
         assert crc1 != crc2
 
+    def test_crc_matches_reference(self, tmp_path):
+        """Test the CRC backend against the nibble-wise FIT SDK algorithm"""
+        writer = FITFileWriter()
+        writer.add_file_id_message()
+        writer.add_workout_message("Test", 1)
+        writer.add_workout_step(0, "Step", 0, 1000, 100, 200, 0)
+
+        temp_path = tmp_path / "reference.fit"
+        writer.write_fit_file(str(temp_path))
+
+        data = temp_path.read_bytes()
+        for chunk in (b"", b"\x00", b"\xff", bytes(range(256)), data):
+            expected = _calculate_crc_reference(chunk)
+            assert writer._calculate_crc(chunk) == expected
+
+        # The CRC of a file including its CRC bytes is zero
+        assert _calculate_crc_reference(data) == 0
+
+    def test_crc_chaining(self):
+        """Test that CRC can be continued across chunks of data"""
+        writer = FITFileWriter()
+
+        chained = writer._calculate_crc(b"Hello, ")
+        chained = writer._calculate_crc(b"World!", chained)
+        assert chained == writer._calculate_crc(b"Hello, World!")
+
 
 class TestMessageTypes:
     """Test message type handling"""
 
     def test_local_message_type_assignment(self, tmp_path):
-        """Test local message type assignment during file writing"""
+        """Test local message type assignment"""
         writer = FITFileWriter()
 
         # Add different global message types
@@ -288,7 +359,7 @@ class TestMessageTypes:
         writer.add_workout_message("Test", 1)  # global type 26
         writer.add_workout_step(0, "Step", 0, 1000, 100, 200, 0)  # global type 27
 
-        # Local message types are assigned during write_fit_file
+        # Local message types are assigned as messages are added
         temp_path = tmp_path / "message_types.fit"
 
         writer.write_fit_file(str(temp_path))
@@ -323,6 +394,67 @@ class TestMessageTypes:
         assert 27 in writer.local_message_types  # WORKOUT_STEP
         assert writer.local_message_types[27] == 1  # Second local type assigned
 
+    def test_definition_written_once_per_type(self, tmp_path):
+        """Test that a definition message is only written on first use of a type"""
+        writer = FITFileWriter()
+        writer.add_file_id_message()
+        writer.add_workout_step(0, "Step 1", 0, 1000, 100, 200, 0)
+        writer.add_workout_step(1, "Step 2", 0, 2000, 150, 250, 0)
+
+        temp_path = tmp_path / "definitions.fit"
+        writer.write_fit_file(str(temp_path))
+
+        data = temp_path.read_bytes()[14:-2]
+
+        # FILE_ID definition: header, reserved, architecture, global type, 4 fields
+        file_id_definition = bytes([0x40, 0, 0, 0, 0, 4])
+        file_id_definition += bytes([0, 1, 0, 1, 2, 132, 2, 2, 132, 3, 4, 134])
+        assert data.startswith(file_id_definition)
+
+        # WORKOUT_STEP definition appears once, shared by both steps
+        step_definition_header = bytes([0x41, 0, 0]) + struct.pack("<H", 27)
+        assert data.count(step_definition_header) == 1
+
+    def test_definition_written_for_different_field_numbers(self, tmp_path):
+        """Test that records differing only in field numbers get their own definitions"""
+        writer = FITFileWriter()
+        writer.add_file_id_message()
+        writer._add_message(27, [(254, "uint16", 0), (4, "uint32", 111)])
+        writer._add_message(27, [(254, "uint16", 1), (2, "uint32", 222)])
+
+        temp_path = tmp_path / "field_numbers.fit"
+        writer.write_fit_file(str(temp_path))
+
+        data = temp_path.read_bytes()[14:-2]
+
+        # Same field types, so only the field numbers tell the definitions apart
+        step_definition_header = bytes([0x41, 0, 0]) + struct.pack("<H", 27) + b"\x02"
+        target_definition = step_definition_header + bytes([254, 2, 132, 4, 4, 134])
+        duration_definition = step_definition_header + bytes([254, 2, 132, 2, 4, 134])
+
+        assert target_definition + struct.pack("<BHI", 1, 0, 111) in data
+        assert data.endswith(duration_definition + struct.pack("<BHI", 1, 1, 222))
+
+    def test_definition_rewritten_when_field_numbers_change_back(self, tmp_path):
+        """Test that a local type is redefined whenever its field numbers change"""
+        writer = FITFileWriter()
+        writer.add_file_id_message()
+        writer._add_message(27, [(254, "uint16", 0), (4, "uint32", 111)])
+        writer._add_message(27, [(254, "uint16", 1), (2, "uint32", 222)])
+        writer._add_message(27, [(254, "uint16", 2), (4, "uint32", 333)])
+
+        temp_path = tmp_path / "redefinitions.fit"
+        writer.write_fit_file(str(temp_path))
+
+        data = temp_path.read_bytes()[14:-2]
+
+        step_definition_header = bytes([0x41, 0, 0]) + struct.pack("<H", 27) + b"\x02"
+        target_definition = step_definition_header + bytes([254, 2, 132, 4, 4, 134])
+
+        # The third record switches back, so the first definition is written again
+        assert data.count(target_definition) == 2
+        assert data.endswith(target_definition + struct.pack("<BHI", 1, 2, 333))
+
 
 class TestFieldTypes:
     """Test field type handling"""
@@ -913,5 +1045,42 @@ class TestCalculateFTPTargets:
         assert isinstance(target_high, int)
 
 
+class TestCalculateFTPTargetsBulk:
+    """Test the calculate_ftp_targets_bulk function"""
+
+    def test_matches_scalar_single_values(self):
+        """Test bulk results match calculate_ftp_targets for single power values"""
+        fractions = [0.0, 0.3, 0.33, 0.5, 0.75, 1.0, 1.09, 1.4]
+
+        targets_low, targets_high = calculate_ftp_targets_bulk(fractions, ftp=280)
+
+        for fraction, low, high in zip(fractions, targets_low, targets_high):
+            assert (low, high) == calculate_ftp_targets(fraction, ftp=280)
+
+    def test_matches_scalar_power_ranges(self):
+        """Test bulk results match calculate_ftp_targets for power ranges"""
+        low_fractions = [0.5, 0.4, 0.44, 0.8]
+        high_fractions = [0.75, 0.7, 0.75, 0.6]
+
+        targets_low, targets_high = calculate_ftp_targets_bulk(
+            low_fractions, ftp=250, power_high_fractions=high_fractions
+        )
+
+        for i in range(len(low_fractions)):
+            expected = calculate_ftp_targets(
+                low_fractions[i], ftp=250, power_high_fraction=high_fractions[i]
+            )
+            assert (targets_low[i], targets_high[i]) == expected
+
+    def test_return_types(self):
+        """Test that bulk function returns lists of Python integers"""
+        targets_low, targets_high = calculate_ftp_targets_bulk([0.75], ftp=280)
+
+        assert targets_low == [1189]
+        assert targets_high == [1231]
+        assert isinstance(targets_low[0], int)
+        assert isinstance(targets_high[0], int)
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
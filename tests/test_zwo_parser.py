@@ -6,8 +6,6 @@ including testing of individual functions and edge cases.
 """
 
 import pytest
-import os
-import tempfile
 import xml.etree.ElementTree as ET
 from pathlib import Path
 
@@ -54,6 +52,12 @@ class TestWorkoutSegment:
         assert segment.power_end == 0.7
         assert segment.power is None
 
+    def test_segment_is_immutable(self):
+        """Test that segments cannot be modified, so they can be shared"""
+        segment = WorkoutSegment(type="steady", duration=600, power=0.8)
+        with pytest.raises(AttributeError):
+            segment.power = 0.9
+
 
 class TestWorkout:
     """Test the Workout dataclass"""
@@ -216,6 +220,14 @@ class TestElementParsing:
         assert len(rest_segments) == 1
         assert all(s.duration == 0 for s in rest_segments)
 
+    def test_parse_intervals_t_zero_repeat(self):
+        """Test parsing of IntervalsT element with no repetitions"""
+        element = ET.Element("IntervalsT")
+        element.set("Repeat", "0")
+        element.set("OffDuration", "0")
+
+        assert _parse_intervals_t(element) == []
+
     def test_parse_workout_elements_mixed(self):
         """Test parsing of workout elements with mixed types"""
         # Create a mock workout root element
@@ -406,47 +418,35 @@ class TestErrorHandling:
         with pytest.raises(FileNotFoundError):
             parse_zwo_to_workout("non_existent_file.zwo")
 
-    def test_invalid_xml(self):
+    def test_invalid_xml(self, tmp_path):
         """Test handling of invalid XML"""
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".zwo", delete=False) as f:
-            f.write("This is not valid XML")
-            f.flush()
+        zwo_path = tmp_path / "invalid.zwo"
+        zwo_path.write_text("This is not valid XML")
 
-            try:
-                with pytest.raises(ET.ParseError):
-                    parse_zwo_to_workout(f.name)
-            finally:
-                os.unlink(f.name)
+        with pytest.raises(ET.ParseError):
+            parse_zwo_to_workout(str(zwo_path))
 
-    def test_malformed_zwo(self):
+    def test_malformed_zwo(self, tmp_path):
         """Test handling of malformed ZWO file"""
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".zwo", delete=False) as f:
-            f.write('<?xml version="1.0"?><invalid_root></invalid_root>')
-            f.flush()
-
-            try:
-                # Should not raise an error, but return workout with defaults
-                workout = parse_zwo_to_workout(f.name)
-                assert workout.name == "Workout"  # Default name
-                assert workout.description == ""  # Default description
-                assert len(workout.segments) == 0  # No segments
-            finally:
-                os.unlink(f.name)
-
-    def test_missing_workout_element(self):
+        zwo_path = tmp_path / "malformed.zwo"
+        zwo_path.write_text('<?xml version="1.0"?><invalid_root></invalid_root>')
+
+        # Should not raise an error, but return workout with defaults
+        workout = parse_zwo_to_workout(str(zwo_path))
+        assert workout.name == "Workout"  # Default name
+        assert workout.description == ""  # Default description
+        assert len(workout.segments) == 0  # No segments
+
+    def test_missing_workout_element(self, tmp_path):
         """Test ZWO file without workout element"""
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".zwo", delete=False) as f:
-            f.write(
-                '<?xml version="1.0"?><workout_file><name>Test</name></workout_file>'
-            )
-            f.flush()
+        zwo_path = tmp_path / "no_workout.zwo"
+        zwo_path.write_text(
+            '<?xml version="1.0"?><workout_file><name>Test</name></workout_file>'
+        )
 
-            try:
-                workout = parse_zwo_to_workout(f.name)
-                assert workout.name == "Test"
-                assert len(workout.segments) == 0
-            finally:
-                os.unlink(f.name)
+        workout = parse_zwo_to_workout(str(zwo_path))
+        assert workout.name == "Test"
+        assert len(workout.segments) == 0
 
 
 class TestIntegration:
@@ -473,33 +473,17 @@ class TestIntegration:
             assert ws.power_start == s.power_start
             assert ws.power_end == s.power_end
 
-    def test_performance_with_large_intervals(self):
+    def test_performance_with_large_intervals(self, large_intervals_zwo):
         """Test performance with large number of intervals"""
-        # Create a workout with many intervals
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".zwo", delete=False) as f:
-            f.write('<?xml version="1.0"?>')
-            f.write("<workout_file>")
-            f.write("<name>Large Interval Test</name>")
-            f.write("<workout>")
-            f.write(
-                '<IntervalsT Repeat="100" OnDuration="10" OffDuration="5" OnPower="1.0" OffPower="0.5"/>'
-            )
-            f.write("</workout>")
-            f.write("</workout_file>")
-            f.flush()
-
-            try:
-                import time
-
-                start_time = time.time()
-                workout = parse_zwo_to_workout(f.name)
-                parse_time = time.time() - start_time
-
-                # Should parse quickly (under 1 second) and create correct number of segments
-                assert parse_time < 1.0
-                assert len(workout.segments) == 200  # 100 work + 100 rest
-            finally:
-                os.unlink(f.name)
+        import time
+
+        start_time = time.time()
+        workout = parse_zwo_to_workout(str(large_intervals_zwo))
+        parse_time = time.time() - start_time
+
+        # Should parse quickly (under 1 second) and create correct number of segments
+        assert parse_time < 1.0
+        assert len(workout.segments) == 200  # 100 work + 100 rest
 
 
 if __name__ == "__main__":
@@ -1,10 +1,15 @@
 import os
-import glob
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from zwo_parser import parse_zwo_to_workout
 from fit_writer import FITFileWriter
 
 # FIT file writing is now handled by the fit_writer module
 
+# Smallest batch converted with a process pool; smaller batches run in-process
+PARALLEL_BATCH_MIN_FILES = 5
+
 
 def create_fit_file(
     segments, output_path: str, workout_name: str = "Workout", ftp: int = 250
@@ -26,10 +31,30 @@ def create_fit_file(
         raise
 
 
-def convert_zwo_to_fit(zwo_path: str, fit_path: str = None, ftp: int = 250):
-    """Convert a single ZWO file to FIT format"""
+def _is_up_to_date(target_path: str, source_path: str) -> bool:
+    """Check whether target_path exists and is not older than source_path"""
+    try:
+        return os.stat(target_path).st_mtime_ns >= os.stat(source_path).st_mtime_ns
+    except FileNotFoundError:
+        return False
+
+
+def convert_zwo_to_fit(
+    zwo_path: str, fit_path: str = None, ftp: int = 250, skip_unchanged: bool = False
+):
+    """
+    Convert a single ZWO file to FIT format
+
+    With skip_unchanged, the conversion is skipped if the FIT file is already
+    newer than the ZWO file. The check only looks at modification times, so
+    leave it off after changing the FTP.
+    """
     if fit_path is None:
-        fit_path = zwo_path.replace(".zwo", ".fit")
+        fit_path = str(Path(zwo_path).with_suffix(".fit"))
+
+    if skip_unchanged and _is_up_to_date(fit_path, zwo_path):
+        print(f"Up to date: {fit_path}")
+        return True
 
     try:
         workout = parse_zwo_to_workout(zwo_path)
@@ -44,10 +69,27 @@ def convert_zwo_to_fit(zwo_path: str, fit_path: str = None, ftp: int = 250):
         return False
 
 
+def _convert_to_directory(
+    zwo_file: str, output_directory: str, ftp: int, skip_unchanged: bool = False
+) -> bool:
+    """Convert a single ZWO file to a FIT file of the same name in output_directory"""
+    fit_filename = Path(zwo_file).with_suffix(".fit").name
+    fit_path = os.path.join(output_directory, fit_filename)
+
+    return convert_zwo_to_fit(zwo_file, fit_path, ftp, skip_unchanged)
+
+
 def batch_convert_zwo_to_fit(
-    input_directory: str, output_directory: str = None, ftp: int = 250
+    input_directory: str,
+    output_directory: str = None,
+    ftp: int = 250,
+    skip_unchanged: bool = False,
 ):
-    """Convert all ZWO files in a directory to FIT format"""
+    """
+    Convert all ZWO files in a directory to FIT format
+
+    skip_unchanged is passed on to convert_zwo_to_fit for every file.
+    """
     if output_directory is None:
         output_directory = input_directory
 
@@ -55,7 +97,17 @@ def batch_convert_zwo_to_fit(
     os.makedirs(output_directory, exist_ok=True)
 
     # Find all ZWO files
-    zwo_files = glob.glob(os.path.join(input_directory, "*.zwo"))
+    try:
+        with os.scandir(input_directory) as entries:
+            zwo_files = [
+                entry.path
+                for entry in entries
+                if entry.name.endswith(".zwo")
+                and not entry.name.startswith(".")  # Skip hidden files
+                and entry.is_file()
+            ]
+    except (FileNotFoundError, NotADirectoryError):
+        zwo_files = []
 
     if not zwo_files:
         print(f"No .zwo files found in {input_directory}")
@@ -63,14 +115,25 @@ def batch_convert_zwo_to_fit(
 
     print(f"Found {len(zwo_files)} .zwo files to convert...")
 
-    success_count = 0
-    for zwo_file in zwo_files:
-        filename = os.path.basename(zwo_file)
-        fit_filename = filename.replace(".zwo", ".fit")
-        fit_path = os.path.join(output_directory, fit_filename)
-
-        if convert_zwo_to_fit(zwo_file, fit_path, ftp):
-            success_count += 1
+    if len(zwo_files) < PARALLEL_BATCH_MIN_FILES:
+        # Too few files to make up for starting worker processes
+        success_count = sum(
+            _convert_to_directory(zwo_file, output_directory, ftp, skip_unchanged)
+            for zwo_file in zwo_files
+        )
+    else:
+        # Files are independent, so convert them in parallel across processes
+        chunksize = max(1, len(zwo_files) // (4 * (os.cpu_count() or 1)))
+        with ProcessPoolExecutor() as executor:
+            results = executor.map(
+                _convert_to_directory,
+                zwo_files,
+                repeat(output_directory),
+                repeat(ftp),
+                repeat(skip_unchanged),
+                chunksize=chunksize,
+            )
+            success_count = sum(results)
 
     print(f"Successfully converted {success_count}/{len(zwo_files)} files")
 
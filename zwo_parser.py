@@ -10,9 +10,9 @@ from typing import List, Optional
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class WorkoutSegment:
-    """Represents a single workout segment"""
+    """Represents a single workout segment (immutable, so instances can be shared)"""
 
     type: str  # 'warmup', 'steady', 'cooldown', 'interval_work', 'interval_rest', 'repeat_interval'
     duration: int  # Duration in seconds
@@ -24,7 +24,7 @@ class WorkoutSegment:
     repeat_until_step: Optional[int] = None  # Step index to repeat until
 
 
-@dataclass
+@dataclass(slots=True)
 class Workout:
     """Represents a complete workout"""
 
@@ -86,26 +86,28 @@ def _parse_intervals_t(element: ET.Element) -> List[WorkoutSegment]:
     on_power = float(element.get("OnPower", 0.9))
     off_power = float(element.get("OffPower", 0.5))
 
-    segments = []
+    # Every repetition has identical work and rest segments, so build one of
+    # each and repeat them
+    work = WorkoutSegment(type="interval_work", duration=on_duration, power=on_power)
+    rest = WorkoutSegment(type="interval_rest", duration=off_duration, power=off_power)
+    segments = [work, rest] * repeat
 
-    # Create individual work and rest segments for each repetition
-    for i in range(repeat):
-        # Add work interval
-        segments.append(
-            WorkoutSegment(type="interval_work", duration=on_duration, power=on_power)
-        )
-
-        # Add rest interval (except after last repeat if off_duration is 0)
-        if i < repeat - 1 or off_duration > 0:
-            segments.append(
-                WorkoutSegment(
-                    type="interval_rest", duration=off_duration, power=off_power
-                )
-            )
+    # Drop the rest after the last repeat if off_duration is 0
+    if segments and off_duration <= 0:
+        segments.pop()
 
     return segments
 
 
+# Parser for each supported workout element tag
+_ELEMENT_PARSERS = {
+    "Warmup": _parse_warmup,
+    "SteadyState": _parse_steady_state,
+    "Cooldown": _parse_cooldown,
+    "IntervalsT": _parse_intervals_t,
+}
+
+
 def _parse_workout_elements(root: ET.Element) -> List[WorkoutSegment]:
     """Parse workout elements from the XML root"""
     segments = []
@@ -115,18 +117,38 @@ def _parse_workout_elements(root: ET.Element) -> List[WorkoutSegment]:
         return segments
 
     for element in workout_element:
-        if element.tag == "Warmup":
-            segments.append(_parse_warmup(element))
-        elif element.tag == "SteadyState":
-            segments.append(_parse_steady_state(element))
-        elif element.tag == "Cooldown":
-            segments.append(_parse_cooldown(element))
-        elif element.tag == "IntervalsT":
-            segments.extend(_parse_intervals_t(element))
+        parse_element = _ELEMENT_PARSERS.get(element.tag)
+        if parse_element is None:
+            continue  # Unsupported element
+
+        result = parse_element(element)
+        if isinstance(result, list):
+            segments.extend(result)
+        else:
+            segments.append(result)
 
     return segments
 
 
+def _read_zwo_root(zwo_path: str) -> ET.Element:
+    """
+    Read a ZWO file and return the root element of its XML.
+
+    Raises:
+        FileNotFoundError: If the ZWO file doesn't exist
+        ET.ParseError: If the XML is malformed
+    """
+    try:
+        # Read the file in one go and hand it to the parser as a single chunk
+        with open(zwo_path, "rb") as f:
+            return ET.fromstring(f.read())
+
+    except ET.ParseError as e:
+        raise ET.ParseError(f"Invalid XML in ZWO file {zwo_path}: {e}")
+    except FileNotFoundError:
+        raise FileNotFoundError(f"ZWO file not found: {zwo_path}")
+
+
 def parse_zwo_to_workout(zwo_path: str) -> Workout:
     """
     Parse a ZWO file and return a Workout object.
@@ -142,34 +164,28 @@ def parse_zwo_to_workout(zwo_path: str) -> Workout:
         ET.ParseError: If the XML is malformed
         ValueError: If required elements are missing
     """
-    try:
-        tree = ET.parse(zwo_path)
-        root = tree.getroot()
+    root = _read_zwo_root(zwo_path)
 
-        # Extract workout metadata
-        name = _get_text_or_default(root.find("name"), "Workout")
-        description = _get_text_or_default(root.find("description"), "")
+    # Extract workout metadata
+    name = _get_text_or_default(root.find("name"), "Workout")
+    description = _get_text_or_default(root.find("description"), "")
 
-        # Parse workout segments
-        segments = _parse_workout_elements(root)
+    # Parse workout segments
+    segments = _parse_workout_elements(root)
 
-        return Workout(name=name, description=description, segments=segments)
-
-    except ET.ParseError as e:
-        raise ET.ParseError(f"Invalid XML in ZWO file {zwo_path}: {e}")
-    except FileNotFoundError:
-        raise FileNotFoundError(f"ZWO file not found: {zwo_path}")
+    return Workout(name=name, description=description, segments=segments)
 
 
 def parse_zwo_to_segments(zwo_path: str) -> List[WorkoutSegment]:
     """
     Parse a ZWO file and return a list of WorkoutSegment objects.
 
+    Only the workout elements are parsed; no Workout object is built.
+
     Args:
         zwo_path: Path to the .zwo file
 
     Returns:
         List of WorkoutSegment objects
     """
-    workout = parse_zwo_to_workout(zwo_path)
-    return workout.segments
+    return _parse_workout_elements(_read_zwo_root(zwo_path))
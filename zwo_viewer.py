@@ -2,10 +2,12 @@
 
 import matplotlib.pyplot as plt
 import numpy as np
-from zwift2fit import parse_zwo_file
+from zwo_parser import parse_zwo_to_workout
 import argparse
 import os
 
+RAMP_TYPES = frozenset(("warmup", "cooldown"))
+
 
 class ZWOWorkoutVisualizer:
     """Visualize ZWO workout files with power profiles and step analysis"""
@@ -32,43 +34,39 @@ class ZWOWorkoutVisualizer:
         if not segments:
             return np.array([0]), np.array([0])
 
-        time_points = []
-        power_points = []
-
-        current_time = 0
-
-        for segment in segments:
-            start_time = current_time
-            end_time = current_time + segment["duration"]
-
-            # Add start and end points
-            time_points.extend([start_time, end_time])
-
-            # Determine power value
-            if segment["type"] == "warmup":
-                # For warmup, use average power
-                (
-                    (segment["power_start"] + segment["power_end"]) / 2 * self.ftp
-                )
-                power_points.extend(
-                    [segment["power_start"] * self.ftp, segment["power_end"] * self.ftp]
-                )
-            elif segment["type"] == "cooldown":
-                # For cooldown, use average power
-                (
-                    (segment["power_start"] + segment["power_end"]) / 2 * self.ftp
-                )
-                power_points.extend(
-                    [segment["power_start"] * self.ftp, segment["power_end"] * self.ftp]
-                )
-            else:
-                # Steady power
-                power = segment["power"] * self.ftp
-                power_points.extend([power, power])
-
-            current_time = end_time
-
-        return np.array(time_points), np.array(power_points)
+        count = len(segments)
+        durations = np.fromiter(
+            (segment.duration for segment in segments), dtype=np.int64, count=count
+        )
+        # Ramps (warmup/cooldown) go from start to end power, others are steady
+        power_start = np.fromiter(
+            (
+                segment.power_start if segment.type in RAMP_TYPES else segment.power
+                for segment in segments
+            ),
+            dtype=np.float64,
+            count=count,
+        )
+        power_end = np.fromiter(
+            (
+                segment.power_end if segment.type in RAMP_TYPES else segment.power
+                for segment in segments
+            ),
+            dtype=np.float64,
+            count=count,
+        )
+
+        # Each segment contributes a (start, end) point pair
+        end_times = np.cumsum(durations)
+        time_points = np.empty(2 * count, dtype=np.int64)
+        time_points[0::2] = end_times - durations
+        time_points[1::2] = end_times
+
+        power_points = np.empty(2 * count)
+        power_points[0::2] = power_start * self.ftp
+        power_points[1::2] = power_end * self.ftp
+
+        return time_points, power_points
 
     def plot_zwo_workout(
         self, zwo_path: str, save_path: str = None, show_plot: bool = True
@@ -76,18 +74,18 @@ class ZWOWorkoutVisualizer:
         """Display ZWO workout visualization and details"""
 
         # Parse ZWO file
-        workout_info = parse_zwo_file(zwo_path)
-        segments = workout_info["segments"]
+        workout = parse_zwo_to_workout(zwo_path)
+        segments = workout.segments
 
         if not segments:
             print("No segments found")
             return
 
         # Calculate total duration
-        total_duration = sum(seg["duration"] for seg in segments)
+        total_duration = workout.total_duration
 
         # Print workout summary
-        print(f"\n{workout_info['name']} (ZWO)")
+        print(f"\n{workout.name} (ZWO)")
         print(f"Duration: {total_duration // 60}:{total_duration % 60:02d}")
         print(f"Steps: {len(segments)}")
         print(f"Source: {os.path.basename(zwo_path)}")
@@ -102,6 +100,16 @@ class ZWOWorkoutVisualizer:
             time_data, power_data = self.create_power_profile(segments)
             time_minutes = time_data / 60
 
+            # Segment timeline shared by both charts: the profile holds each
+            # segment's (start, end) pair, so reuse it instead of re-summing
+            start_minutes = time_minutes[0::2]
+            end_minutes = time_minutes[1::2]
+            duration_minutes = (time_data[1::2] - time_data[0::2]) / 60
+            colors = [
+                self.intensity_colors.get(segment.type, "#808080")
+                for segment in segments
+            ]
+
             # Plot power profile
             ax_power.plot(
                 time_minutes,
@@ -113,16 +121,12 @@ class ZWOWorkoutVisualizer:
             )
 
             # Add step blocks with different colors based on type
-            current_time = 0
-            for segment in segments:
-                start_min = current_time / 60
-                end_min = (current_time + segment["duration"]) / 60
-                segment_color = self.intensity_colors.get(segment["type"], "#808080")
-
+            for start_min, end_min, segment_color in zip(
+                start_minutes, end_minutes, colors
+            ):
                 ax_power.axvspan(
                     start_min, end_min, alpha=0.2, color=segment_color, zorder=1
                 )
-                current_time += segment["duration"]
 
             # Add FTP reference line
             ax_power.axhline(
@@ -137,7 +141,7 @@ class ZWOWorkoutVisualizer:
             # Format power chart
             ax_power.set_ylabel("Power (watts)", fontsize=12)
             ax_power.set_title(
-                f"{workout_info['name']} - Power Profile Over Time",
+                f"{workout.name} - Power Profile Over Time",
                 fontsize=14,
                 fontweight="bold",
             )
@@ -145,27 +149,14 @@ class ZWOWorkoutVisualizer:
             ax_power.legend()
 
             if len(power_data) > 0:
-                max_power = max(power_data)
+                max_power = power_data.max()
                 ax_power.set_ylim(0, max_power * 1.1)
 
-            # Create step timeline
-            colors = []
-            durations = []
-            starts = []
-
-            current_time = 0
-            for segment in segments:
-                segment_color = self.intensity_colors.get(segment["type"], "#808080")
-                colors.append(segment_color)
-                durations.append(segment["duration"] / 60)
-                starts.append(current_time / 60)
-                current_time += segment["duration"]
-
             # Plot step timeline
             bars = ax_steps.barh(
                 range(len(segments)),
-                durations,
-                left=starts,
+                duration_minutes,
+                left=start_minutes,
                 color=colors,
                 alpha=0.8,
                 edgecolor="black",
@@ -205,25 +196,29 @@ class ZWOWorkoutVisualizer:
 
             plt.show()
 
-        # Print detailed step information
-        print("\nSTEP DETAILS:")
-        print("-" * 80)
+        # Print detailed step information, built up and written in one call
+        lines = ["\nSTEP DETAILS:", "-" * 80]
 
         for i, segment in enumerate(segments):
-            segment_type = self.intensity_names.get(
-                segment["type"], segment["type"].title()
-            )
-            duration_str = f"{segment['duration'] // 60}:{segment['duration'] % 60:02d}"
+            segment_type = self.intensity_names.get(segment.type, segment.type.title())
+            duration_str = f"{segment.duration // 60}:{segment.duration % 60:02d}"
 
-            if segment["type"] in ["warmup", "cooldown"]:
-                power_str = f"{segment['power_start'] * 100:.0f}-{segment['power_end'] * 100:.0f}% FTP ({segment['power_start'] * self.ftp:.0f}-{segment['power_end'] * self.ftp:.0f}W)"
+            if segment.type in RAMP_TYPES:
+                power_str = f"{segment.power_start * 100:.0f}-{segment.power_end * 100:.0f}% FTP ({segment.power_start * self.ftp:.0f}-{segment.power_end * self.ftp:.0f}W)"
             else:
-                power_str = f"{segment['power'] * 100:.0f}% FTP ({segment['power'] * self.ftp:.0f}W)"
+                power_str = (
+                    f"{segment.power * 100:.0f}% FTP ({segment.power * self.ftp:.0f}W)"
+                )
 
-            print(f"{i + 1:2d}. {segment_type:<8} | {duration_str} | {power_str}")
+            lines.append(
+                f"{i + 1:2d}. {segment_type:<8} | {duration_str} | {power_str}"
+            )
 
-        print("-" * 80)
-        print(f"Total Duration: {total_duration // 60}:{total_duration % 60:02d}")
+        lines.append("-" * 80)
+        lines.append(
+            f"Total Duration: {total_duration // 60}:{total_duration % 60:02d}"
+        )
+        print("\n".join(lines))
 
 
 def main():